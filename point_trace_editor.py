@@ -3,7 +3,89 @@
 
 import tkinter as tk
 from tkinter import ttk, messagebox
-import pyperclip
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    # numba is optional, without it the numpy version of the line hit-test is used
+    njit = None
+
+
+def _first_seg_near_py(pts, x, y, tol2):
+    """
+    Return the index of the first line segment of the polyline `pts` within sqrt(tol2) of (x, y), or -1.
+
+    Distances are compared squared so no per-segment sqrt is needed. Written as a plain loop for numba to compile.
+    """
+    tol = tol2**0.5
+    # Iterate through each point pair combo to find line segments and then check if (x, y) is near any of them
+    for i in range(len(pts) - 1):
+        x1 = pts[i, 0]
+        y1 = pts[i, 1]
+        x2 = pts[i + 1, 0]
+        y2 = pts[i + 1, 1]
+        # Cheaply skip segments whose bounding box, grown by the tolerance, doesn't contain (x, y)
+        lo_x, hi_x = (x1, x2) if x1 < x2 else (x2, x1)
+        lo_y, hi_y = (y1, y2) if y1 < y2 else (y2, y1)
+        if x < lo_x - tol or x > hi_x + tol or y < lo_y - tol or y > hi_y + tol:
+            continue
+        # Find the line segment vector
+        line_vec_x = x2 - x1
+        line_vec_y = y2 - y1
+        line_length_squared = line_vec_x * line_vec_x + line_vec_y * line_vec_y
+        if line_length_squared == 0:
+            # Line segment is a point, use distance to that point
+            d2 = (x - x1) ** 2 + (y - y1) ** 2
+        else:
+            # Projection of the point vector P onto the line segment vector L is: P dot L / ||L||
+            # This can be negative (before the start of the segment) or greater than 1 (beyond the end of the
+            # segment), so we clamp it.
+            projection = ((x - x1) * line_vec_x + (y - y1) * line_vec_y) / line_length_squared
+            if projection < 0:
+                projection = 0.0
+            elif projection > 1:
+                projection = 1.0
+            # This allows us to find the closest point on the line segment
+            closest_x = x1 + projection * line_vec_x
+            closest_y = y1 + projection * line_vec_y
+            d2 = (x - closest_x) ** 2 + (y - closest_y) ** 2
+        if d2 <= tol2:
+            return i
+    return -1
+
+
+def _first_seg_near_np(pts, x, y, tol2):
+    """Numpy version of `_first_seg_near_py`, computing the distance to every segment at once."""
+    x1 = pts[:-1, 0]
+    y1 = pts[:-1, 1]
+    line_vec_x = pts[1:, 0] - x1
+    line_vec_y = pts[1:, 1] - y1
+    line_length_squared = line_vec_x * line_vec_x + line_vec_y * line_vec_y
+    # Zero length segments also have a zero dot product, so dividing by 1 instead leaves their projection at 0
+    # and the distance is to the segment's start point
+    projection = np.clip(
+        ((x - x1) * line_vec_x + (y - y1) * line_vec_y)
+        / np.maximum(line_length_squared, 1),
+        0,
+        1,
+    )
+    d2 = (x - (x1 + projection * line_vec_x)) ** 2 + (
+        y - (y1 + projection * line_vec_y)
+    ) ** 2
+    hits = np.flatnonzero(d2 <= tol2)
+    return int(hits[0]) if hits.size else -1
+
+
+# With an explicit signature numba compiles the kernel here at import, before the window opens, rather than on the
+# first click. cache=True keeps the compiled kernel on disk so later runs load it instead of recompiling.
+_first_seg_near = (
+    _first_seg_near_np
+    if njit is None
+    else njit("int64(float32[:, :], float64, float64, float64)", cache=True)(
+        _first_seg_near_py
+    )
+)
 
 
 class PointTraceEditor:
@@ -15,20 +97,41 @@ class PointTraceEditor:
         self.main_window.title("Point Trace Editor")
         self.main_window.geometry("800x700")
 
-        # list to store points
-        self.points = []
+        # buffer to store points, the first self._n rows are in use. Grown by doubling its capacity.
+        self._cap = 64
+        self._n = 0
+        self._xy = np.empty((self._cap, 2), np.int32)
+        # incremented on every edit of the points, so derived state can tell when it is out of date
+        self._version = 0
+        # version of the points last shown in the terminal
+        self._last_rendered_version = None
+        # cached copy-ready coordinate string and the version of the points it was built from
+        self._coord_str = ""
+        self._coord_str_version = None
+        # float32 copy of the points for the line hit-test, None until needed after the points change
+        self._pts_f32 = None
         # drawing options for points
         self.point_colour = "black"
         self.point_line_colour = "black"
         self.point_text_colour = "black"
         self.point_dragging_colour = "red"
+        # also sets the cached sizes derived from the radius, see the point_radius setter
         self.point_radius = 3
 
+        # canvas item ids, kept in step with the points so edits only touch the affected items
+        self._ovals = []
+        self._labels = []
+        # a single line item joins all the points, None while there are fewer than two
+        self._line = None
+
         # drag state tracking
         self.dragging = False
         self.drag_point_index = None
         self.drag_start_x = 0
         self.drag_start_y = 0
+        # pending idle redraw of a dragged point
+        self._redraw_pending = False
+        self._redraw_index = None
 
         # mouse position tracking for delete functionality
         self.mouse_x = 0
@@ -120,6 +223,59 @@ class PointTraceEditor:
         self.update_terminal()
         self.redraw_canvas()
 
+    @property
+    def point_radius(self):
+        """Radius of the drawn points."""
+        return self._point_radius
+
+    @point_radius.setter
+    def point_radius(self, radius):
+        self._point_radius = radius
+        # bounding box offsets of a point circle from its centre
+        self._r_box = (-radius, -radius, radius, radius)
+        # squared click radius for hit-tests, a bit larger than the visual radius
+        self._click_r2 = (radius + 5) ** 2
+
+    @property
+    def points(self):
+        """(N, 2) view of the placed points. Modify them through the point methods below, not the view."""
+        return self._xy[: self._n]
+
+    def append_point(self, x, y):
+        """Add a point to the end of the trace."""
+        self.insert_point(self._n, x, y)
+
+    def insert_point(self, index, x, y):
+        """Insert a point into the trace before `index`."""
+        if self._n == self._cap:
+            # Double the capacity so appends are amortised O(1)
+            self._cap *= 2
+            self._xy = np.resize(self._xy, (self._cap, 2))
+        # Shift the tail along one to make room
+        self._xy[index + 1 : self._n + 1] = self._xy[index : self._n]
+        self._xy[index] = (x, y)
+        self._n += 1
+        self.points_changed()
+
+    def move_point(self, index, x, y):
+        """Move the point at `index` to (x, y)."""
+        self._xy[index] = (x, y)
+        self.points_changed()
+
+    def pop_point(self, index):
+        """Remove the point at `index` from the trace, returning its (x, y)."""
+        x, y = self._xy[index].tolist()
+        # Shift the tail back one over the removed point
+        self._xy[index : self._n - 1] = self._xy[index + 1 : self._n]
+        self._n -= 1
+        self.points_changed()
+        return x, y
+
+    def points_changed(self):
+        """Invalidate anything derived from the points. Called after every edit."""
+        self._version += 1
+        self._pts_f32 = None
+
     def on_canvas_click(self, event):
         """Run whenever the canvas is clicked."""
         x, y = event.x, event.y
@@ -133,6 +289,7 @@ class PointTraceEditor:
             self.drag_point_index = clicked_point_index
             self.drag_start_x = x
             self.drag_start_y = y
+            self.draw_point_highlight(clicked_point_index, True)
             self.status_var.set(f"Dragging point {clicked_point_index + 1}")
         else:
             # Check if clicking on a line segment to insert a point
@@ -141,37 +298,52 @@ class PointTraceEditor:
             if line_segment is not None:
                 # Insert new point between the two points of the line segment
                 insert_index = line_segment + 1
-                self.points.insert(insert_index, (x, y))
-                self.redraw_canvas()
+                self.insert_point(insert_index, x, y)
+                self.draw_inserted_point(insert_index)
                 self.update_terminal()
                 self.status_var.set(
                     f"Point inserted at position {insert_index + 1}: ({x}, {y})"
                 )
             else:
                 # Create new point at end of list
-                self.points.append((x, y))
-                self.redraw_canvas()
+                self.append_point(x, y)
+                self.draw_inserted_point(self._n - 1)
                 self.update_terminal()
-                self.status_var.set(f"Point {len(self.points)} placed at ({x}, {y})")
+                self.status_var.set(f"Point {self._n} placed at ({x}, {y})")
 
     def on_canvas_drag(self, event):
         """Handle mouse drag events."""
         if self.dragging and self.drag_point_index is not None:
             # Update the position of the dragged point
             x, y = event.x, event.y
-            self.points[self.drag_point_index] = (x, y)
-            self.redraw_canvas()
-            self.status_var.set(
-                f"Moving point {self.drag_point_index + 1} to ({x}, {y})"
-            )
+            self.move_point(self.drag_point_index, x, y)
+            # Motion events can arrive faster than we can draw, so only draw once the event queue is idle
+            self._redraw_index = self.drag_point_index
+            if not self._redraw_pending:
+                self._redraw_pending = True
+                self.main_window.after_idle(self._flush_redraw)
+
+    def _flush_redraw(self):
+        """Draw the latest position of the dragged point, coalescing the motion events since the last draw."""
+        if not self._redraw_pending:
+            # The release handler has already drawn the final position
+            return
+        self._redraw_pending = False
+        x, y = self.points[self._redraw_index].tolist()
+        self.draw_moved_point(self._redraw_index)
+        self.status_var.set(f"Moving point {self._redraw_index + 1} to ({x}, {y})")
 
-    def on_canvas_release(self, event):
+    def on_canvas_release(self, _event):
         """Handle mouse release events."""
         if self.dragging:
-            x, y = event.x, event.y
-            self.points[self.drag_point_index] = (x, y)
-            self.redraw_canvas()
+            # The drag handler has already moved the point, only the final draw may still be outstanding. Do it
+            # now rather than leave it to the idle callback, which would overwrite the status below.
+            if self._redraw_pending:
+                self._redraw_pending = False
+                self.draw_moved_point(self.drag_point_index)
+            self.draw_point_highlight(self.drag_point_index, False)
             self.update_terminal()
+            x, y = self.points[self.drag_point_index].tolist()
             self.status_var.set(
                 f"Point {self.drag_point_index + 1} moved to ({x}, {y})"
             )
@@ -195,8 +367,8 @@ class PointTraceEditor:
         point_index = self.find_point_at_position(self.mouse_x, self.mouse_y)
 
         if point_index is not None:
-            deleted_point = self.points.pop(point_index)
-            self.redraw_canvas()
+            deleted_point = self.pop_point(point_index)
+            self.draw_deleted_point(point_index)
             self.update_terminal()
             self.status_var.set(
                 f"Deleted point at ({deleted_point[0]}, {deleted_point[1]})"
@@ -206,14 +378,11 @@ class PointTraceEditor:
 
     def find_point_at_position(self, x, y):
         """Find if there's a point at the given position (within click radius)."""
-        click_radius = self.point_radius + 5  # A bit larger than the visual radius
-
-        for i, (px, py) in enumerate(self.points):
-            # Calculate distance from click to point center
-            distance = ((x - px) ** 2 + (y - py) ** 2) ** 0.5
-            if distance <= click_radius:
-                return i
-        return None
+        # Compare squared distances from click to every point center at once, no need for a sqrt
+        points = self.points
+        d2 = (points[:, 0] - x) ** 2 + (points[:, 1] - y) ** 2
+        hits = np.flatnonzero(d2 <= self._click_r2)
+        return int(hits[0]) if hits.size else None
 
     def find_line_at_position(self, x, y):
         """
@@ -232,148 +401,191 @@ class PointTraceEditor:
         int or None
             The index of the first point of the line segment if found, otherwise None.
         """
-        if len(self.points) < 2:
+        if self._n < 2:
             return None
 
         line_click_tolerance = 5
 
-        # Iterate through each point pair combo to find line segments and then check if the cursor is near any
-        # line segments
         # Note that if there are two line segments that meet this criteria, the first one will be returned.
-        for i in range(len(self.points) - 1):
-            x1, y1 = self.points[i]
-            x2, y2 = self.points[i + 1]
-
-            # Calculate distance from point to line segment
-            if (
-                self.point_to_line_distance(x, y, x1, y1, x2, y2)
-                <= line_click_tolerance
-            ):
-                return i
-        return None
-
-    def point_to_line_distance(self, px, py, x1, y1, x2, y2):
-        """Calculate the shortest distance from a point to a line segment."""
-
-        # To find distance, need to find closest point on the line segment
-        # first, check if the line is of zero length
-        if (x1 == x2) and (y1 == y2):
-            # Line segment is a point, return distance to that point
-            return ((px - x1) ** 2 + (py - y1) ** 2) ** 0.5
-        else:
-            # Find the line segment vector
-            line_vec_x = x2 - x1
-            line_vec_y = y2 - y1
-            # Find the point vector from the start of the line segment
-            point_vec_x = px - x1
-            point_vec_y = py - y1
-            # Calculate the projection of the point vector onto the line segment
-            line_length_squared = line_vec_x**2 + line_vec_y**2
-            dot_product_point_line = point_vec_x * line_vec_x + point_vec_y * line_vec_y
-            # Projection of the point vector P onto the line segment vector L is:
-            # P dot L / ||L||
-            # This will yeild a scalar value that tells us how far along the line segment the point projects,
-            # but this can be negative or greater than the length of the line segment.
-            # If it's negative, then the point lies before the start of the segment, and if it's greater than 1, then
-            # it lies beyong the end of the segment.
-            # So we clamp it.
-            projection = dot_product_point_line / line_length_squared
-            projection = max(0, min(1, projection))
-            # This allows us to find the closest point on the line segment
-            closest_x = x1 + projection * line_vec_x
-            closest_y = y1 + projection * line_vec_y
-            # Now can calculate distance point to closest point on line segment
-            distance = ((px - closest_x) ** 2 + (py - closest_y) ** 2) ** 0.5
-            return distance
+        if self._pts_f32 is None:
+            self._pts_f32 = self.points.astype(np.float32)
+        i = _first_seg_near(self._pts_f32, x, y, line_click_tolerance**2)
+        return i if i >= 0 else None
 
     def clear_points(self):
         """Clear all placed points."""
-        self.points.clear()
+        self._n = 0
+        self.points_changed()
         self.redraw_canvas()
         self.update_terminal()
         self.status_var.set("All points cleared")
 
+    def create_point_items(self, xs, ys, first_number):
+        """
+        Create the circles and number labels for a run of points, returning lists of their canvas item ids.
+
+        Parameters:
+        -----------
+        xs, ys : list of int
+            The coordinates of the points.
+        first_number : int
+            The number to label the first point with, the rest are numbered consecutively.
+
+        Returns:
+        --------
+        tuple of list of int
+            The ids of the circles and of the labels.
+        """
+        # Look up drawing options once rather than for every point
+        x0, y0, x1, y1 = self._r_box
+        fill = self.point_colour
+        text_fill = self.point_text_colour
+        create_oval = self.canvas.create_oval
+        create_text = self.canvas.create_text
+
+        ovals = []
+        labels = []
+        for number, (x, y) in enumerate(zip(xs, ys), first_number):
+            # Draw point circle
+            ovals.append(
+                create_oval(
+                    x + x0, y + y0, x + x1, y + y1, fill=fill, outline="black", width=1
+                )
+            )
+            # Add point number label
+            labels.append(
+                create_text(
+                    x + 10,
+                    y - 10,
+                    text=str(number),
+                    fill=text_fill,
+                    font=("Arial", 8, "bold"),
+                )
+            )
+        return ovals, labels
+
     def redraw_canvas(self):
         """Redraw all points and lines on the canvas."""
         # Clear the entire canvas
         self.canvas.delete("all")
 
         # Draw lines between consecutive points
-        if len(self.points) > 1:
-            for i in range(len(self.points) - 1):
-                x1, y1 = self.points[i]
-                x2, y2 = self.points[i + 1]
-                self.canvas.create_line(
-                    x1, y1, x2, y2, fill=self.point_line_colour, width=2
-                )
+        self._line = None
+        self.draw_trace_line()
 
-        # Draw all points
-        for i, (x, y) in enumerate(self.points, 1):
-            # Determine point color (highlight if being dragged)
-            point_color = (
-                self.point_dragging_colour
-                if (self.dragging and self.drag_point_index == i - 1)
-                else self.point_colour
-            )
-            point_outline = "black"
+        # Draw all points. Convert the coordinates to python ints in one go rather than per point.
+        xs = self._xy[: self._n, 0].tolist()
+        ys = self._xy[: self._n, 1].tolist()
+        self._ovals, self._labels = self.create_point_items(xs, ys, 1)
 
-            # Draw point circle
-            self.canvas.create_oval(
-                x - self.point_radius,
-                y - self.point_radius,
-                x + self.point_radius,
-                y + self.point_radius,
-                fill=point_color,
-                outline=point_outline,
-                width=2 if (self.dragging and self.drag_point_index == i - 1) else 1,
-            )
+        # Highlight the point being dragged, if any
+        if self.dragging and self.drag_point_index is not None:
+            self.draw_point_highlight(self.drag_point_index, True)
+
+    def draw_point_highlight(self, index, dragged):
+        """Switch the circle of the point at `index` to or from its highlighted, being dragged, style."""
+        self.canvas.itemconfigure(
+            self._ovals[index],
+            fill=self.point_dragging_colour if dragged else self.point_colour,
+            width=2 if dragged else 1,
+        )
 
-            # Add point number label
-            self.canvas.create_text(
-                x + 10,
-                y - 10,
-                text=str(i),
-                fill=self.point_text_colour,
-                font=("Arial", 8, "bold"),
+    def draw_trace_line(self):
+        """Update the line joining the points, creating or deleting it as the point count requires."""
+        if self._n < 2:
+            if self._line is not None:
+                self.canvas.delete(self._line)
+                self._line = None
+            return
+
+        # All segments are drawn as one multi-segment line item, [x0, y0, x1, y1, ...]
+        coords = self.points.ravel().tolist()
+        if self._line is None:
+            self._line = self.canvas.create_line(
+                *coords, fill=self.point_line_colour, width=2
             )
+            # Lines sit beneath the points
+            self.canvas.tag_lower(self._line)
+        else:
+            self.canvas.coords(self._line, *coords)
+
+    def draw_moved_point(self, index):
+        """Move the canvas items for the point at `index` and the line through it."""
+        x, y = self.points[index].tolist()
+        x0, y0, x1, y1 = self._r_box
+        self.canvas.coords(self._ovals[index], x + x0, y + y0, x + x1, y + y1)
+        self.canvas.coords(self._labels[index], x + 10, y - 10)
+        self.draw_trace_line()
+
+    def draw_inserted_point(self, index):
+        """Create canvas items for a point just inserted at `index`."""
+        x, y = self.points[index].tolist()
+        ovals, labels = self.create_point_items([x], [y], index + 1)
+        self._ovals[index:index] = ovals
+        self._labels[index:index] = labels
+
+        self.draw_trace_line()
+
+        # Points after the inserted one have been renumbered
+        self.renumber_labels(index + 1)
+
+    def draw_deleted_point(self, index):
+        """Remove canvas items for a point just deleted from `index`."""
+        self.canvas.delete(self._ovals.pop(index))
+        self.canvas.delete(self._labels.pop(index))
+
+        self.draw_trace_line()
+
+        # Points after the deleted one have been renumbered
+        self.renumber_labels(index)
+
+    def renumber_labels(self, start):
+        """Update the number labels of the points from index `start` onwards to match their positions."""
+        for i in range(start, len(self._labels)):
+            self.canvas.itemconfigure(self._labels[i], text=str(i + 1))
 
     def update_terminal(self):
         """Update the terminal text widget."""
-        self.terminal_text.delete(1.0, tk.END)
+        # Nothing to do if the points haven't changed since the last update
+        if self._last_rendered_version == self._version:
+            return
+        self._last_rendered_version = self._version
 
-        if not self.points:
-            self.terminal_text.insert(
-                tk.END,
-                "No points placed.",
-            )
+        if self._n == 0:
+            self.terminal_text.replace(1.0, tk.END, "No points placed.")
             return
 
+        # Build the whole text up front so the widget is only updated once
         # Display points in a readable format
-        self.terminal_text.insert(tk.END, "Placed Points:\n")
-        self.terminal_text.insert(tk.END, "-" * 40 + "\n")
-
-        for i, (x, y) in enumerate(self.points, 1):
-            self.terminal_text.insert(tk.END, f"Point {i}: ({x}, {y})\n")
+        lines = ["Placed Points:", "-" * 40]
+        lines.extend(f"Point {i}: ({x}, {y})" for i, (x, y) in enumerate(self.points.tolist(), 1))
 
         # print copy-ready format
-        self.terminal_text.insert(tk.END, "\n" + "=" * 40 + "\n")
-        self.terminal_text.insert(tk.END, "Copy-ready format:\n")
-        self.terminal_text.insert(tk.END, "-" * 40 + "\n")
-
-        # coordinate list
-        coord_list = ", ".join([f"({x}, {y})" for x, y in self.points])
-        self.terminal_text.insert(tk.END, f"Coordinates: {coord_list}\n\n")
+        coord_list = self._get_coord_str()
+        lines += ["", "=" * 40, "Copy-ready format:", "-" * 40]
+        lines += [f"Coordinates: {coord_list}", "", ""]
+        self.terminal_text.replace(1.0, tk.END, "\n".join(lines))
+
+    def _get_coord_str(self):
+        """Return the copy-ready coordinate list, rebuilding it only if the points have changed."""
+        if self._coord_str_version != self._version:
+            self._coord_str = ", ".join([f"({x}, {y})" for x, y in self.points.tolist()])
+            self._coord_str_version = self._version
+        return self._coord_str
 
     def copy_coordinates(self):
         """Copy coordinates to clipboard in simple format."""
-        if not self.points:
+        if self._n == 0:
             messagebox.showwarning(
                 "No Points", "No points to copy. Place some points first."
             )
             return
 
-        coord_list = ", ".join([f"({x}, {y})" for x, y in self.points])
-        pyperclip.copy(coord_list)
+        coord_list = self._get_coord_str()
+        # Tk's own clipboard, no external clipboard tool needed
+        self.main_window.clipboard_clear()
+        self.main_window.clipboard_append(coord_list)
+        self.main_window.update()
         self.status_var.set("Coordinates copied to clipboard!")
 
 